@@ -77,4 +77,27 @@ class OrderSwapApparatus(Apparatus):
 class DeletionApparatus(Apparatus):
     deleted: str
     corrected: str
-    type: str = field(default="deletion", init=False)
\ No newline at end of file
+    type: str = field(default="deletion", init=False)
+
+
+APPARATUS_TYPES = {
+    cls.__dataclass_fields__["type"].default: cls
+    for cls in (
+        Apparatus,
+        MissingApparatus,
+        FullSpellingApparatus,
+        LetterSwapApparatus,
+        WordSwapApparatus,
+        OrderSwapApparatus,
+        DeletionApparatus,
+    )
+}
+
+
+def apparatus_from_dict(data):
+    """
+    Rebuilds an Apparatus instance (of the right subclass) from the output of ``to_dict()``.
+    """
+    cls = APPARATUS_TYPES[data.get("type", "apparatus")]
+    kwargs = {name: data[name] for name, f in cls.__dataclass_fields__.items() if f.init and name in data}
+    return cls(**kwargs)
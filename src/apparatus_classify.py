@@ -0,0 +1,88 @@
+"""
+Classification of parsed variants into Apparatus types (the decision tree of ``parser.py``).
+"""
+import difflib
+import re
+
+from apparatus_classes import *
+
+# the base text that the apparatus records are relative to
+BASE_SOURCE = 'ש'
+
+
+def _strip_ahevi(text):
+    if len(text) > 0 and text[0] in 'אהוי':
+        text = text[1:]
+    if len(text) > 0 and text[-1] in 'אהוי':
+        text = text[:-1]
+    return text
+
+
+def classify_variant(variant, song_name, source=BASE_SOURCE):
+    """
+    Turns a parsed variant into the matching Apparatus subclass.
+    Returns None for a deletion whose deleted and corrected text are identical.
+    """
+    parts = {'regular': [], 'italic': [], 'strike': []}
+    for subsentence, fmt in zip(variant['subsentences'], variant['formats']):
+        parts[fmt].append(subsentence)
+    comment = ' '.join(parts['italic']) or None
+    common = dict(song_name=song_name, line=variant['line'], lemma=variant['lemma'],
+                  source=source, target=variant['manuscript'])
+
+    if any(re.search(r'\bחסר\b', text) for text in parts['italic']):
+        return MissingApparatus(**common)
+
+    if parts['strike']:
+        deleted = ' '.join(parts['strike'])
+        corrected = ' '.join(parts['regular'])
+        if deleted == corrected:
+            return None
+        return DeletionApparatus(deleted=deleted, corrected=corrected, comment=comment, **common)
+
+    if not parts['regular']:
+        # just a comment without correction
+        return Apparatus(comment=comment, **common)
+
+    lemma = variant['lemma']
+    correction_text = ' '.join(parts['regular']).strip("!?,:\'\"[](); ")
+    if not correction_text or correction_text == lemma:
+        return Apparatus(comment=comment, **common)
+
+    if len(lemma.split()) != len(correction_text.split()):
+        return WordSwapApparatus(text=' '.join(parts['regular']), comment=comment, **common)
+
+    # compare letters, ignoring a leading/trailing אהוי
+    char_diff = list(difflib.ndiff(_strip_ahevi(lemma), _strip_ahevi(correction_text)))
+    added_chars = [char[2:] for char in char_diff if char.startswith('+ ')]
+    removed_chars = [char[2:] for char in char_diff if char.startswith('- ')]
+    only_ahevi = all(char in 'אהוי' for char in added_chars + removed_chars)
+    only_added_or_removed = bool(added_chars) != bool(removed_chars)
+    if only_ahevi and only_added_or_removed:
+        return FullSpellingApparatus(text=correction_text, comment=comment, **common)
+
+    same_lengths = all(len(c) == len(l) for c, l in zip(correction_text.split(), lemma.split()))
+    if not same_lengths:
+        return WordSwapApparatus(text=correction_text, comment=comment, **common)
+
+    if set(lemma.split()) == set(correction_text.split()):
+        return OrderSwapApparatus(text=correction_text, comment=comment, **common)
+
+    # diff characters again, now with full text: a single letter changed at the same place
+    char_diff = list(difflib.ndiff(lemma, correction_text))
+    added_chars = [char[2:] for char in char_diff if char.startswith('+ ')]
+    removed_chars = [char[2:] for char in char_diff if char.startswith('- ')]
+    if (len(added_chars) == 1 and len(removed_chars) == 1
+            and lemma.index(removed_chars[0]) == correction_text.index(added_chars[0])):
+        return LetterSwapApparatus(text=correction_text, old_letter=removed_chars[0],
+                                   new_letter=added_chars[0], comment=comment, **common)
+    return WordSwapApparatus(text=correction_text, comment=comment, **common)
+
+
+def classify_variants(variant_list, song_name, source=BASE_SOURCE):
+    correction_list = []
+    for variant in variant_list:
+        correction = classify_variant(variant, song_name, source)
+        if correction is not None:
+            correction_list.append(correction)
+    return correction_list
@@ -0,0 +1,143 @@
+"""
+Edition-to-edition diff of apparatus collections.
+
+Records are keyed by (song_name, line, lemma, target, type). Both sides are walked as sorted
+streams in a single merge pass, grouping records that share (song_name, line, lemma, target):
+within a group, a type present on both sides is compared field by field ("modified"), a type that
+disappears on one side and appears on the other is "reclassified", and the rest are "added" or
+"removed".
+"""
+from dataclasses import dataclass, field
+from itertools import groupby
+import json
+
+from apparatus_classes import Apparatus
+
+
+def diff_key(item):
+    """
+    Sort/match key of an apparatus record: (song_name, line, lemma, target, type).
+    """
+    return item.song_name, int(item.line), item.lemma, item.target or "", item.type
+
+
+def _anchor(item):
+    return diff_key(item)[:4]
+
+
+@dataclass(frozen=True)
+class ApparatusChange:
+    """
+    A single difference between two editions. ``old`` is None for additions, ``new`` for removals.
+    """
+    kind: str
+    old: Apparatus | None = None
+    new: Apparatus | None = None
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "old": self.old.to_dict() if self.old is not None else None,
+            "new": self.new.to_dict() if self.new is not None else None,
+        }
+
+
+@dataclass
+class ApparatusDiff:
+    """
+    Structured change report between two apparatus collections.
+    """
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    reclassified: list = field(default_factory=list)
+    modified: list = field(default_factory=list)
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.reclassified or self.modified)
+
+    def to_dict(self):
+        return {kind: [change.to_dict() for change in getattr(self, kind)]
+                for kind in ("added", "removed", "reclassified", "modified")}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+
+
+def _diff_group(old_group, new_group):
+    old_by_type, new_by_type = {}, {}
+    for item in old_group:
+        old_by_type.setdefault(item.type, []).append(item)
+    for item in new_group:
+        new_by_type.setdefault(item.type, []).append(item)
+
+    only_old, only_new = [], []
+    for typ in sorted(old_by_type.keys() | new_by_type.keys()):
+        olds, news = old_by_type.get(typ, []), new_by_type.get(typ, [])
+        for old, new in zip(olds, news):
+            if old.to_dict() != new.to_dict():
+                yield ApparatusChange("modified", old, new)
+        only_old.extend(olds[len(news):])
+        only_new.extend(news[len(olds):])
+
+    for old, new in zip(only_old, only_new):
+        yield ApparatusChange("reclassified", old, new)
+    for old in only_old[len(only_new):]:
+        yield ApparatusChange("removed", old=old)
+    for new in only_new[len(only_old):]:
+        yield ApparatusChange("added", new=new)
+
+
+def _check_sorted(items, side):
+    previous = None
+    for item in items:
+        anchor = _anchor(item)
+        if previous is not None and anchor < previous:
+            raise ValueError(f"{side} records are not sorted by diff_key: {anchor} follows {previous}")
+        previous = anchor
+        yield item
+
+
+def iter_changes(old_sorted, new_sorted):
+    """
+    Merges two streams of Apparatus records, each already sorted by ``diff_key``, and yields
+    ``ApparatusChange`` objects as soon as each (song_name, line, lemma, target) group is complete.
+    Runs in time linear in the total number of records.
+
+    :raises ValueError: If a stream is not sorted, i.e. a record's key is lower than the previous one.
+    """
+    old_groups = groupby(_check_sorted(old_sorted, "old"), key=_anchor)
+    new_groups = groupby(_check_sorted(new_sorted, "new"), key=_anchor)
+    old_next = next(old_groups, None)
+    new_next = next(new_groups, None)
+    while old_next is not None or new_next is not None:
+        if new_next is None or (old_next is not None and old_next[0] < new_next[0]):
+            for old in old_next[1]:
+                yield ApparatusChange("removed", old=old)
+            old_next = next(old_groups, None)
+        elif old_next is None or new_next[0] < old_next[0]:
+            for new in new_next[1]:
+                yield ApparatusChange("added", new=new)
+            new_next = next(new_groups, None)
+        else:
+            yield from _diff_group(list(old_next[1]), list(new_next[1]))
+            old_next = next(old_groups, None)
+            new_next = next(new_groups, None)
+
+
+def diff_apparatus(old, new, presorted=False):
+    """
+    Compares two apparatus collections and returns an ``ApparatusDiff``.
+
+    :param old: Records of the previous edition.
+    :param new: Records of the new edition.
+    :param presorted: Set when both inputs are already sorted by ``diff_key``, to skip the sort
+        and diff in one linear pass. Pipeline output is in document order, not key order, so it
+        must not be passed as presorted; unsorted input raises ValueError.
+    """
+    if not presorted:
+        old = sorted(old, key=diff_key)
+        new = sorted(new, key=diff_key)
+    report = ApparatusDiff()
+    for change in iter_changes(old, new):
+        getattr(report, change.kind).append(change)
+    return report
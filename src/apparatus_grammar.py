@@ -0,0 +1,63 @@
+"""
+pyparsing grammar of an apparatus paragraph (see ``parser.py``) and its flattening into one
+variant dict per (lemma, variant, manuscript).
+"""
+import re
+
+import pyparsing as pp
+from pyparsing.unicode import pyparsing_unicode as ppu
+
+nums = pp.nums
+alphasnums = ppu.Hebrew.alphas + nums + "'?!\":,;.ֵַּׄׄ"
+
+hebrew_word = pp.Word(alphasnums)
+bold_word = pp.Suppress('*') + hebrew_word + pp.Suppress('*')
+hebrew_sentence = pp.OneOrMore(hebrew_word | "..." | "[!]")
+italic_sentence = pp.Suppress('_') + hebrew_sentence + pp.Suppress('_')
+strike_sentence = pp.Suppress('~') + hebrew_sentence + pp.Suppress('~')
+
+complex_sentence = pp.OneOrMore(pp.Group(italic_sentence.setResultsName("italic") | strike_sentence.setResultsName("strike") | hebrew_sentence.setResultsName("regular")).setResultsName("subsentences", listAllMatches=True))
+pp_variant_apparatus = pp.Group(complex_sentence).setResultsName("text") + pp.Group(pp.OneOrMore(bold_word)).setResultsName("sources")
+# variants of one lemma may also be separated by '/' (e.g. "... *ש* / _ללא כותרת_ *קמ*")
+pp_lemma_apparatus = pp.Group(hebrew_sentence).setResultsName("lemma") + pp.Suppress(']') + pp.OneOrMore(pp.Group(pp_variant_apparatus) | pp.Suppress('/') + pp.Group(pp_variant_apparatus)).setResultsName("variants")
+pp_line_apparatus = pp.Word(nums).setResultsName("line") + pp.delimitedList(pp.Group(pp_lemma_apparatus), delim=pp.Suppress('/')).setResultsName("lemmata")
+pp_title_apparatus = pp.delimitedList(pp.Group(pp_lemma_apparatus), delim=pp.Suppress('/')).setResultsName("lemmata")
+pp_full_apparatus = pp.Group(pp_title_apparatus).setResultsName("title_apparatus") + pp.OneOrMore(pp.Group(pp_line_apparatus)).setResultsName("lines")
+
+
+def is_apparatus_paragraph(text):
+    """
+    An apparatus paragraph has at least one ``lemma]`` entry attributed to a bold witness.
+    """
+    return bool(re.search(r'\]\s', text) and re.search(r'\*[^*\s]+\*', text))
+
+
+def _lemma_variants(line, lemma_apparatus):
+    lemma = ' '.join(lemma_apparatus['lemma'])
+    for variant in lemma_apparatus['variants']:
+        variant_text = [' '.join(subsentence) for subsentence in variant['text']]  # an array of strings
+        variant_text_formats = [next(iter(subsentence.keys())) for subsentence in variant['text']]  # 'italic', 'strike' or 'regular'
+        for manuscript in variant['sources']:
+            yield {
+                'line': line,
+                'lemma': lemma,
+                'text': ' '.join(variant_text),
+                'subsentences': variant_text,
+                'formats': variant_text_formats,
+                'manuscript': manuscript
+            }
+
+
+def parse_variants(text):
+    """
+    Parses an apparatus paragraph into one variant dict per (lemma, variant, manuscript).
+    Entries of the title apparatus get line 0.
+    """
+    parsed = pp_full_apparatus.parseString(text)
+    variant_list = []
+    for lemma_apparatus in parsed['title_apparatus']:
+        variant_list.extend(_lemma_variants(0, lemma_apparatus))
+    for line_apparatus in parsed['lines']:
+        for lemma_apparatus in line_apparatus['lemmata']:
+            variant_list.extend(_lemma_variants(int(line_apparatus['line']), lemma_apparatus))
+    return variant_list
@@ -0,0 +1,228 @@
+"""
+Persistent binary storage for parsed apparatus records.
+
+A corpus file holds a fixed-width NumPy structured array (one row per record) followed by an
+interned UTF-8 string heap. Opening a file memory-maps it and returns a ``CorpusView`` whose
+columns are zero-copy views into the mapping; ``Apparatus`` objects are only built when a
+record is accessed, so opening a corpus costs the same regardless of its size.
+
+File layout (all integers little-endian, sections 8-byte aligned)::
+
+    magic (8 bytes) | header length (u4) | JSON header | records | string offsets (u8) | string bytes
+"""
+import json
+import mmap
+import struct
+from collections import Counter
+from collections.abc import Sequence
+
+from apparatus_classes import APPARATUS_TYPES
+
+MAGIC = b"SHNGCRP1"
+VERSION = 1
+_HEADER_LENGTH = struct.Struct("<I")
+
+TYPE_CODES = {name: code for code, name in enumerate(APPARATUS_TYPES)}
+
+# string-valued fields of the apparatus classes, stored as ids into the string heap (-1 is None)
+STRING_FIELDS = ("song_name", "source", "target", "lemma", "comment",
+                 "text", "old_letter", "new_letter", "deleted", "corrected")
+
+# numpy is only imported when records are written or viewed, so that cheap queries such as
+# ``count_types`` do not pay for it
+RECORD_FIELDS = [("line", "<i4"), ("type", "|u1")] + [(name, "<i4") for name in STRING_FIELDS]
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def write_corpus(path, items):
+    """
+    Writes an iterable of Apparatus instances to ``path`` in the binary corpus format.
+
+    :param path: Destination file path.
+    :param items: Iterable of Apparatus (or subclass) instances.
+    :return: The number of records written.
+    """
+    import numpy as np
+
+    string_ids = {}
+    rows = []
+    for item in items:
+        row = [int(item.line), TYPE_CODES[item.type]]
+        for name in STRING_FIELDS:
+            value = getattr(item, name, None)
+            if value is None:
+                row.append(-1)
+            else:
+                row.append(string_ids.setdefault(value, len(string_ids)))
+        rows.append(tuple(row))
+    records = np.array(rows, dtype=RECORD_FIELDS)
+
+    encoded = [s.encode("utf-8") for s in string_ids]  # dicts keep insertion (= id) order
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    header = json.dumps({
+        "version": VERSION,
+        "types": list(TYPE_CODES),
+        "record_dtype": [list(field) for field in RECORD_FIELDS],
+        "n_records": len(records),
+        "n_strings": len(encoded),
+    }).encode("utf-8")
+
+    records_offset = _align(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+    offsets_offset = _align(records_offset + records.nbytes)
+    strings_offset = offsets_offset + offsets.nbytes
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(b"\0" * (records_offset - f.tell()))
+        f.write(records.tobytes())
+        f.write(b"\0" * (offsets_offset - f.tell()))
+        f.write(offsets.tobytes())
+        for b in encoded:
+            f.write(b)
+    return len(records)
+
+
+def _read_header(buffer):
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a corpus file (bad magic)")
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+    header_start = len(MAGIC) + _HEADER_LENGTH.size
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+    if header.get("version") != VERSION:
+        raise ValueError(f"unsupported corpus version {header.get('version')!r} (expected {VERSION})")
+    if header["types"] != list(TYPE_CODES):
+        raise ValueError("corpus was written with a different set of apparatus types")
+    if [tuple(field) for field in header["record_dtype"]] != RECORD_FIELDS:
+        raise ValueError("corpus was written with a different record layout")
+    return header, _align(header_start + header_length)
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def count_types(path):
+    """
+    Counts the records of each apparatus type in a corpus file by striding over the type column
+    of the mapping, without importing numpy or materializing any record.
+
+    :return: Dict mapping type name to record count.
+    """
+    with _map(path) as buffer:
+        header, records_offset = _read_header(buffer)
+        itemsize = sum(int(code[2:]) for _, code in RECORD_FIELDS)
+        type_offset = records_offset + 4  # the type byte follows the int32 line
+        end = records_offset + header["n_records"] * itemsize
+        codes = Counter(buffer[type_offset:end:itemsize])
+    return {name: codes[code] for name, code in TYPE_CODES.items() if codes[code]}
+
+
+def open_corpus(path):
+    """
+    Memory-maps a corpus file written by ``write_corpus``. The view keeps the file mapped until
+    it is closed, so use it as a context manager (or call ``close()``) before the file is
+    replaced or deleted.
+
+    :param path: Path of the corpus file.
+    :return: A lazy ``CorpusView`` over the stored records.
+    """
+    return CorpusView(_map(path))
+
+
+class CorpusView(Sequence):
+    """
+    Read-only, lazily materialized sequence of Apparatus records backed by a memory map.
+
+    Indexing returns Apparatus instances (a list for slices). For bulk analysis, ``column()``
+    exposes the raw NumPy columns without building any objects, and ``lookup()`` / ``string()``
+    translate between strings and their heap ids.
+
+    Columns are views into the mapping and must be released before ``close()``.
+    """
+
+    def __init__(self, buffer):
+        import numpy as np
+
+        header, records_offset = _read_header(buffer)
+        dtype = np.dtype(RECORD_FIELDS)
+        n_records, n_strings = header["n_records"], header["n_strings"]
+        offsets_offset = _align(records_offset + n_records * dtype.itemsize)
+        strings_offset = offsets_offset + (n_strings + 1) * 8
+
+        self._buffer = buffer
+        self.records = np.frombuffer(buffer, dtype=dtype, count=n_records, offset=records_offset)
+        self._offsets = np.frombuffer(buffer, dtype="<u8", count=n_strings + 1, offset=offsets_offset)
+        self._strings_offset = strings_offset
+        self._types = [APPARATUS_TYPES[name] for name in header["types"]]
+        self._string_ids = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file. Raises BufferError if column views obtained from this corpus are still alive.
+        """
+        if self._buffer.closed:
+            return
+        self.records = self._offsets = None
+        self._buffer.close()
+
+    def __len__(self):
+        if self.records is None:
+            raise ValueError("corpus is closed")
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corpus index out of range")
+        return self._materialize(index)
+
+    def column(self, name):
+        """
+        Returns a zero-copy NumPy view of a record column (``line``, ``type`` or a string-id field).
+        """
+        return self.records[name]
+
+    def string(self, string_id):
+        """
+        Decodes a single string from the heap; ``-1`` decodes to None.
+        """
+        if string_id < 0:
+            return None
+        start = self._strings_offset + int(self._offsets[string_id])
+        end = self._strings_offset + int(self._offsets[string_id + 1])
+        return self._buffer[start:end].decode("utf-8")
+
+    def lookup(self, value):
+        """
+        Returns the heap id of ``value`` (-1 if absent), for filtering columns without decoding them.
+        The reverse index is built on first use.
+        """
+        if self._string_ids is None:
+            self._string_ids = {self.string(i): i for i in range(len(self._offsets) - 1)}
+        return self._string_ids.get(value, -1)
+
+    def _materialize(self, index):
+        row = self.records[index]
+        cls = self._types[row["type"]]
+        kwargs = {"line": int(row["line"])}
+        for name, f in cls.__dataclass_fields__.items():
+            if f.init and name in STRING_FIELDS:
+                kwargs[name] = self.string(int(row[name]))
+        return cls(**kwargs)
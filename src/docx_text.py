@@ -0,0 +1,86 @@
+"""
+Text extraction from poem docx files (the preprocessing of ``main.py``).
+
+Runs with the same formatting are merged and then joined into one string per paragraph, with
+the formatting kept inline as *bold* (witness sigla), _italics_ (comments) and ~strikethrough~.
+"""
+import re
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def has_hebrew_letters(text):
+    return bool(re.search(r'[א-ת]', text))
+
+
+def extract_runs(para):
+    """
+    Merges the runs of a docx paragraph into maximal runs of identical formatting.
+    Returns a list of dicts with keys text, bold, italics, strike.
+    """
+    runs = []
+    curr_run = ''
+    curr_bold = para.runs[0].bold
+    curr_italic = para.runs[0]._element.rPr.find(W_NS + 'iCs') is not None if (para.runs[0]._element.rPr is not None) else False
+    curr_strike = para.runs[0].font.strike if para.runs[0].font else False
+    for run in para.runs:
+        element = run._element.rPr
+        has_iCs = element.find(W_NS + 'iCs') is not None if element is not None else False
+        if (run.bold != curr_bold or has_iCs != curr_italic or run.font.strike != curr_strike) and run.text.strip():
+            if curr_run:
+                runs.append({"text": curr_run, "bold": curr_bold, "italics": curr_italic, "strike": curr_strike})
+            curr_run = run.text
+            curr_bold = run.bold
+            curr_italic = has_iCs
+            curr_strike = run.font.strike if run.font else False
+        else:
+            curr_run += run.text
+    runs.append({"text": curr_run, "bold": curr_bold, "italics": curr_italic, "strike": curr_strike})
+    return runs
+
+
+def iter_paragraphs(filepath):
+    """
+    Yields the merged runs of every non-empty paragraph of a docx file, in document order.
+    """
+    from docx import Document
+
+    for para in Document(filepath).paragraphs:
+        if para.runs:
+            yield extract_runs(para)
+
+
+def extract_paragraphs(filepath):
+    return list(iter_paragraphs(filepath))
+
+
+def join_runs(runs):
+    """
+    Joins the runs of a paragraph into a single string with inline formatting markers:
+    *bold* (one marker pair per word), _italics_ and ~strikethrough~.
+    """
+    joined_text = ''
+    for run in runs:
+        text = run['text']
+        left_spaces = len(text) - len(text.lstrip())
+        text = text.lstrip()
+        right_spaces = len(text) - len(text.rstrip())
+        text = text.rstrip()
+        bold, italics, strike = (run['bold'], run['italics'], run['strike']) if text else (False, False, False)
+
+        formatted_text = ''
+        for word in (text.split() if bold else [text]):
+            if bold and has_hebrew_letters(word):
+                formatted_text += f"*{word}* "  # for bold text, there could be multiple words, so we add a space after each word
+            elif italics and has_hebrew_letters(word):
+                formatted_text += f"_{word}_"
+            elif strike and has_hebrew_letters(word):
+                formatted_text += f"~{word}~"
+            else:
+                formatted_text += f"{word}"
+        joined_text += ' ' * left_spaces + f"{formatted_text.strip()}" + ' ' * right_spaces
+    return joined_text.strip()
+
+
+def join_paragraphs(paragraph_list):
+    return [join_runs(runs) for runs in paragraph_list]
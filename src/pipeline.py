@@ -0,0 +1,260 @@
+"""
+Extract -> parse -> classify pipeline for poem docx files, with a content-hash cache so that a
+poem whose document did not change is never parsed again, and a streaming runner that overlaps
+the stages.
+
+Cached corpora are stored in ``diff_key`` order, so that two versions of a poem are diffed in one
+linear merge over their memory maps.
+"""
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+from pathlib import Path
+
+from apparatus_classify import BASE_SOURCE, classify_variant, classify_variants
+from apparatus_diff import diff_apparatus, diff_key
+from apparatus_grammar import is_apparatus_paragraph, parse_variants
+from corpus_store import VERSION as CORPUS_VERSION, open_corpus, write_corpus
+from docx_text import iter_paragraphs, join_runs
+
+# part of every cache key: bump whenever extraction, parsing or classification changes the records
+# produced for a document, so that corpora cached by an older pipeline are not reused
+PIPELINE_VERSION = 1
+
+
+def song_name_of(filepath):
+    return Path(filepath).stem
+
+
+def process_document(filepath, song_name=None, source=BASE_SOURCE):
+    """
+    Runs extraction, parsing and classification on a poem docx and returns its Apparatus records.
+    """
+    song_name = song_name or song_name_of(filepath)
+    correction_list = []
+    for runs in iter_paragraphs(filepath):
+        text = join_runs(runs)
+        if is_apparatus_paragraph(text):
+            correction_list.extend(classify_variants(parse_variants(text), song_name, source))
+    return correction_list
+
+
+def document_hash(filepath):
+    """
+    SHA-256 of the document bytes, used to recognize unchanged poems.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(doc_hash, song_name, source):
+    """
+    Name of the cached corpus of a document: its content hash combined with everything else that
+    determines its records (song name, base witness, pipeline and corpus format versions).
+    """
+    key = json.dumps([PIPELINE_VERSION, CORPUS_VERSION, doc_hash, song_name, source], ensure_ascii=False)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _load_manifest(cache_dir):
+    path = os.path.join(cache_dir, 'manifest.json')
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def _write_atomically(path, write):
+    """
+    Calls ``write(tmp_path)`` on a temporary file next to ``path`` and then moves it into place, so
+    that an interrupted run never leaves a truncated cache file behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _save_manifest(cache_dir, manifest):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
+
+    _write_atomically(os.path.join(cache_dir, 'manifest.json'), write)
+
+
+def load_document(filepath, cache_dir, song_name=None, source=BASE_SOURCE):
+    """
+    Returns the Apparatus records of a document, sorted by ``diff_key``, parsing it only if
+    ``cache_dir`` has no corpus file for its ``cache_key``.
+    """
+    song_name = song_name or song_name_of(filepath)
+    key = cache_key(document_hash(filepath), song_name, source)
+    return _load_cached(filepath, cache_dir, key, song_name, source)
+
+
+def _load_cached(filepath, cache_dir, key, song_name, source):
+    os.makedirs(cache_dir, exist_ok=True)
+    cached = os.path.join(cache_dir, key + '.shn')
+    if not os.path.exists(cached):
+        records = sorted(process_document(filepath, song_name, source), key=diff_key)
+        _write_atomically(cached, lambda path: write_corpus(path, records))
+    return open_corpus(cached)
+
+
+def update_corpus(filepaths, cache_dir, source=BASE_SOURCE):
+    """
+    Re-processes a set of poem documents against the cache in ``cache_dir``.
+
+    A document whose ``cache_key`` matches the one recorded for its poem is skipped outright
+    (reported as None). Any other document is parsed, stored, and diffed against the previous
+    version of the poem, if there was one, in a single pass over the two mapped corpora. Corpus
+    files of superseded versions are deleted once the manifest no longer refers to them.
+
+    :return: Dict mapping song name to an ``ApparatusDiff``, or None for unchanged poems.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+    reports = {}
+    superseded = set()
+    for filepath in filepaths:
+        song_name = song_name_of(filepath)
+        new_key = cache_key(document_hash(filepath), song_name, source)
+        old_key = manifest.get(song_name)
+        if old_key == new_key:
+            reports[song_name] = None
+            continue
+
+        old_path = os.path.join(cache_dir, f'{old_key}.shn')
+        with _load_cached(filepath, cache_dir, new_key, song_name, source) as new:
+            if old_key and os.path.exists(old_path):
+                with open_corpus(old_path) as old:
+                    reports[song_name] = diff_apparatus(old, new, presorted=True)
+            else:
+                reports[song_name] = diff_apparatus([], new, presorted=True)
+        manifest[song_name] = new_key
+        if old_key:
+            superseded.add(old_key)
+    _save_manifest(cache_dir, manifest)
+    for old_key in superseded - set(manifest.values()):
+        old_path = os.path.join(cache_dir, f'{old_key}.shn')
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    return reports
+
+
+# --- Streaming runner ---
+# The stages run in their own threads connected by bounded queues: a stage blocks when its output
+# queue is full (backpressure), so at most ``maxsize`` items are in flight between two stages and
+# every record reaches the consumer as soon as its paragraph has been classified.
+
+_DONE = object()
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _put(q, item, stop):
+    # ``stop`` is checked before every attempt, not only when the queue is full, so that a stage
+    # does no further work once the pipeline is cancelled
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+    raise _Cancelled
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    raise _Cancelled
+
+
+def _run_stage(func, inbox, outbox, stop, errors):
+    try:
+        items = iter(lambda: _get(inbox, stop), _DONE) if inbox is not None else [None]
+        for item in items:
+            for out in func(item):
+                _put(outbox, out, stop)
+            if stop.is_set():
+                raise _Cancelled
+        _put(outbox, _DONE, stop)
+    except _Cancelled:
+        pass
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+
+
+def stream_documents(filepaths, source=BASE_SOURCE, maxsize=64):
+    """
+    Runs extract -> join -> parse -> classify over poem documents as a threaded pipeline and
+    yields Apparatus records as they come out of the classifier, in document order.
+
+    :param filepaths: Poem .docx files; the song name of each is its file name.
+    :param source: Base witness the variants are relative to.
+    :param maxsize: Capacity of each inter-stage queue.
+    """
+    def extract(_):
+        for filepath in filepaths:
+            song_name = song_name_of(filepath)
+            for runs in iter_paragraphs(filepath):
+                yield song_name, runs
+
+    def join(item):
+        song_name, runs = item
+        yield song_name, join_runs(runs)
+
+    def parse(item):
+        song_name, text = item
+        if is_apparatus_paragraph(text):
+            for variant in parse_variants(text):
+                yield song_name, variant
+
+    def classify(item):
+        song_name, variant = item
+        correction = classify_variant(variant, song_name, source)
+        if correction is not None:
+            yield correction
+
+    stop = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize) for _ in range(4)]
+    threads = [
+        threading.Thread(target=_run_stage, args=(func, inbox, outbox, stop, errors), daemon=True)
+        for func, inbox, outbox in zip((extract, join, parse, classify), [None] + queues[:-1], queues)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            try:
+                item = _get(queues[-1], stop)
+            except _Cancelled:
+                break
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        # also reached when the consumer stops early: unblock and wind down the stages
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
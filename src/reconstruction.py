@@ -0,0 +1,229 @@
+"""
+Reconstruction of every witness's text from the base text and the apparatus.
+
+Each apparatus record says how one witness (``target``) differs from the base (``source``) at one
+lemma of one line. Records are grouped by (song, line) in a single pass; for every line, each
+witness that has records gets a ``PieceTable`` over the shared base line, and witnesses without
+records on that line share the base string itself, so the base is never copied per witness.
+
+Records that cannot be applied are reported instead of applied: "unanchored" when the line or the
+lemma is not found in the base, "ambiguous" when the lemma occurs more than once in its line,
+"conflict" when the lemma overlaps a span already edited for the same witness.
+"""
+from dataclasses import dataclass, field
+from itertools import groupby
+import re
+
+from apparatus_classes import *
+
+
+@dataclass(frozen=True)
+class ReconstructionIssue:
+    """
+    A record that could not be applied. ``other`` is the earlier record it conflicts with, if any.
+    """
+    kind: str
+    record: Apparatus
+    reason: str
+    other: Apparatus | None = None
+
+
+class PieceTable:
+    """
+    Piece table over one base line. Pieces are (buffer, start, end) slices of either the base
+    string or an inserted string; edits are addressed in base coordinates and may only replace a
+    span that is still an unedited slice of the base.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.pieces = [(base, 0, len(base))]
+
+    def replace(self, start, end, text):
+        """
+        Replaces base[start:end] with ``text``. Returns False, leaving the table unchanged, if the
+        span is no longer wholly original (i.e. it overlaps an earlier edit).
+        """
+        for i, (buffer, p_start, p_end) in enumerate(self.pieces):
+            if buffer is self.base and p_start <= start and end <= p_end:
+                new = [(self.base, p_start, start)] if start > p_start else []
+                if text:
+                    new.append((text, 0, len(text)))
+                if end < p_end:
+                    new.append((self.base, end, p_end))
+                self.pieces[i:i + 1] = new
+                return True
+        return False
+
+    def text(self):
+        return ''.join(buffer[start:end] for buffer, start, end in self.pieces)
+
+
+def _word_pattern(word):
+    # whole-word match, so that a lemma like 'אל' does not anchor inside 'ישראל'; editorial
+    # brackets in the base (e.g. 'גופ[ו]') are skipped over
+    pattern = r'[\[\]]?'.join(re.escape(char) for char in word)
+    return re.compile(r'(?<![א-ת\[])\[?' + pattern + r'\]?(?![א-ת\]])')
+
+
+def anchor_lemma(line_text, lemma):
+    """
+    Finds every span ``lemma`` may refer to in a base line; a lemma of the form "first ... last"
+    spans from an occurrence of its head to the next occurrence of its tail. Returns a list of
+    (start, end), empty if the lemma is not found; more than one span means the lemma is ambiguous.
+    """
+    head, _, tail = (part.strip() for part in lemma.partition('...'))
+    if not head:
+        return []
+    spans = []
+    for first in _word_pattern(head).finditer(line_text):
+        if not tail:
+            spans.append(first.span())
+            continue
+        last = _word_pattern(tail).search(line_text, first.end())
+        if last:
+            spans.append((first.start(), last.end()))
+    return spans
+
+
+def _candidate_spans(line_text, span, text):
+    # a word missing from the witness takes one neighbouring space with it: the one after it, or
+    # the one before if that is taken (e.g. by a missing neighbour) or the word ends the line
+    start, end = span
+    if not text:
+        if end < len(line_text) and line_text[end] == ' ':
+            yield start, end + 1
+        if start > 0 and line_text[start - 1] == ' ':
+            yield start - 1, end
+    yield span
+
+
+def replacement_text(record):
+    """
+    The witness's reading of the lemma, or None if the record does not change the text.
+    """
+    if isinstance(record, MissingApparatus):
+        return ''
+    if isinstance(record, DeletionApparatus):
+        return record.corrected
+    if isinstance(record, (LetterSwapApparatus, FullSpellingApparatus, WordSwapApparatus, OrderSwapApparatus)):
+        return record.text
+    return None
+
+
+_MARKERS = re.compile(r'[*_~]')
+
+
+def base_text_lines(paragraphs):
+    """
+    Extracts the base poem from the joined paragraphs of a poem document (see ``docx_text``): the
+    title is line 0 and every following paragraph up to the first empty one, or up to a closing
+    "תם" colophon, is the next line. Trailing source notes and formatting markers are removed.
+
+    :raises ValueError: If an explicit verse number (e.g. "10\t...") does not match the position of
+        its paragraph, i.e. a heading or stanza break would shift the line numbering.
+    """
+    lines = {}
+    for number, text in enumerate(paragraphs):
+        if not text.strip():
+            break
+        verse = re.match(r'^(\d+)\t', text)
+        if verse:
+            if int(verse.group(1)) != number:
+                raise ValueError(f"verse number {verse.group(1)} found at line {number} of the base text")
+            text = text[verse.end():]
+        text = text.split('\t')[0]
+        if _MARKERS.sub('', text).strip() == 'תם':
+            break
+        text = re.sub(r'(\s*\*[^*\s]+\*)+\s*$', '', text)
+        lines[number] = _MARKERS.sub('', text).strip()
+    return lines
+
+
+def load_base_text(filepath):
+    """
+    Returns {line: text} of the base poem of a poem docx.
+    """
+    from docx_text import extract_paragraphs, join_paragraphs
+
+    return base_text_lines(join_paragraphs(extract_paragraphs(filepath)))
+
+
+@dataclass
+class Reconstruction:
+    """
+    Result of ``reconstruct_witnesses``.
+
+    :ivar lines: {(song_name, witness): {line: text}} for the lines the witness has records on.
+    :ivar base: {song_name: {line: text}}, the text of every line without records.
+    :ivar issues: Records that were not applied.
+    """
+    base: dict
+    lines: dict = field(default_factory=dict)
+    issues: list = field(default_factory=list)
+
+    def witnesses(self, song_name):
+        return sorted(witness for song, witness in self.lines if song == song_name)
+
+    def witness_lines(self, song_name, witness):
+        """
+        Full text of a witness as {line: text}, falling back to the base for untouched lines. A
+        song without base text has no lines.
+        """
+        edited = self.lines.get((song_name, witness), {})
+        return {line: edited.get(line, text) for line, text in self.base.get(song_name, {}).items()}
+
+    def witness_text(self, song_name, witness):
+        lines = self.witness_lines(song_name, witness)
+        return '\n'.join(lines[line] for line in sorted(lines))
+
+
+def _line_key(record):
+    return record.song_name, int(record.line)
+
+
+def reconstruct_witnesses(base_texts, records):
+    """
+    Applies all apparatus records to the base texts, for every witness of every poem, in a single
+    pass over the records grouped by (song, line).
+
+    :param base_texts: {song_name: {line: base text}}, e.g. from ``load_base_text``.
+    :param records: Iterable of Apparatus records (any order).
+    :return: A ``Reconstruction``.
+    """
+    result = Reconstruction(base=base_texts)
+    for (song_name, line), group in groupby(sorted(records, key=_line_key), key=_line_key):
+        base_line = base_texts.get(song_name, {}).get(line)
+        tables = {}
+        applied = {}  # (witness, start, end) -> record, to name the other side of a conflict
+        for record in group:
+            text = replacement_text(record)
+            if text is None:
+                continue
+            if base_line is None:
+                result.issues.append(ReconstructionIssue('unanchored', record, f'line {line} not in base text'))
+                continue
+            spans = anchor_lemma(base_line, record.lemma)
+            if not spans:
+                result.issues.append(ReconstructionIssue('unanchored', record, 'lemma not found in base line'))
+                continue
+            if len(spans) > 1:
+                result.issues.append(ReconstructionIssue(
+                    'ambiguous', record, f'lemma occurs {len(spans)} times in base line'))
+                continue
+            span = spans[0]
+
+            if record.target not in tables:
+                tables[record.target] = PieceTable(base_line)
+            table = tables[record.target]
+            edited = next((c for c in _candidate_spans(base_line, span, text) if table.replace(*c, text)), None)
+            if edited is not None:
+                applied[(record.target, *edited)] = record
+            else:
+                other = next((r for (w, s, e), r in applied.items()
+                              if w == record.target and s < span[1] and span[0] < e), None)
+                result.issues.append(ReconstructionIssue('conflict', record, 'lemma overlaps an earlier edit', other))
+
+        for witness, table in tables.items():
+            result.lines.setdefault((song_name, witness), {})[line] = table.text()
+    return result
@@ -0,0 +1,205 @@
+"""
+``shmuel`` command line entry point.
+
+Every subcommand reads files (or stdin when no file is given) and writes JSON Lines to stdout,
+so the stages can be chained::
+
+    shmuel extract poem.docx | shmuel parse | shmuel classify | shmuel stats
+    shmuel classify -o corpus.shn variants.jsonl && shmuel stats corpus.shn
+    shmuel run poems/*.docx > corpus.jsonl    # all stages in one threaded, streaming process
+
+Heavy dependencies (python-docx, pyparsing, numpy, matplotlib, networkx) are imported inside the
+subcommand that needs them, never at module level, so e.g. ``stats`` starts without any of them.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _read_jsonl(paths):
+    if not paths:
+        paths = ['-']
+    for path in paths:
+        f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def _read_apparatus(paths):
+    """
+    Yields Apparatus objects from binary corpus files (``.shn``) and/or JSON Lines.
+    """
+    from apparatus_classes import apparatus_from_dict
+
+    json_paths = []
+    for path in paths or []:
+        if path.endswith('.shn'):
+            from corpus_store import open_corpus
+            with open_corpus(path) as corpus:
+                yield from corpus
+        else:
+            json_paths.append(path)
+    if json_paths or not paths:
+        for data in _read_jsonl(json_paths):
+            yield apparatus_from_dict(data)
+
+
+def _write(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False))
+    sys.stdout.write('\n')
+
+
+def cmd_extract(args):
+    from docx_text import iter_paragraphs, join_runs
+
+    for path in args.files:
+        song_name = args.song_name or Path(path).stem
+        for index, runs in enumerate(iter_paragraphs(path)):
+            _write({'song_name': song_name, 'paragraph': index, 'text': join_runs(runs)})
+
+
+def cmd_parse(args):
+    from apparatus_grammar import is_apparatus_paragraph, parse_variants
+
+    for paragraph in _read_jsonl(args.files):
+        if is_apparatus_paragraph(paragraph['text']):
+            for variant in parse_variants(paragraph['text']):
+                _write({'song_name': paragraph.get('song_name'), **variant})
+
+
+def cmd_classify(args):
+    from apparatus_classify import classify_variant
+
+    def corrections():
+        for variant in _read_jsonl(args.files):
+            correction = classify_variant(variant, args.song_name or variant.get('song_name'), args.source)
+            if correction is not None:
+                yield correction
+
+    if args.output:
+        from corpus_store import write_corpus
+        write_corpus(args.output, corrections())
+    else:
+        for correction in corrections():
+            _write(correction.to_dict())
+
+
+def cmd_run(args):
+    from pipeline import stream_documents
+
+    records = stream_documents(args.files, source=args.source, maxsize=args.queue_size)
+    if args.output:
+        from corpus_store import write_corpus
+        write_corpus(args.output, records)
+    else:
+        for correction in records:
+            _write(correction.to_dict())
+            sys.stdout.flush()
+
+
+def cmd_stats(args):
+    from collections import Counter
+
+    counts = Counter()
+    rest = []
+    for path in args.files:
+        if path.endswith('.shn') and args.by == 'type':
+            from corpus_store import count_types
+            counts.update(count_types(path))
+        else:
+            rest.append(path)
+    if rest or not args.files:
+        if any(path.endswith('.shn') for path in rest):
+            counts.update(getattr(item, args.by) for item in _read_apparatus(rest))
+        else:
+            counts.update(record.get(args.by) for record in _read_jsonl(rest))
+
+    total = sum(counts.values())
+    for key, count in counts.most_common():
+        _write({args.by: key, 'count': count, 'percentage': round(count / total * 100, 2)})
+
+
+def cmd_graph(args):
+    import matplotlib
+    if args.output:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from viz.GPT_graph_viz import draw_manuscript_graph, save_graph_figure
+
+    fig, ax = draw_manuscript_graph(
+        list(_read_apparatus(args.files)),
+        layout=args.layout,
+        min_edge_weight=args.min_edge_weight,
+        lod=args.lod,
+        max_primitives=args.max_primitives,
+        seed=args.seed,
+    )
+    if args.output:
+        save_graph_figure(fig, args.output)
+    else:
+        plt.show()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='shmuel', description='Critical apparatus tools for the poems of Shmuel HaNagid.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('extract', help='docx -> one JSON line per paragraph, with inline formatting markers')
+    p.add_argument('files', nargs='+', help='poem .docx files')
+    p.add_argument('--song-name', help='song name (default: file name)')
+    p.set_defaults(func=cmd_extract)
+
+    p = subparsers.add_parser('parse', help='paragraphs -> one JSON line per (lemma, variant, manuscript)')
+    p.add_argument('files', nargs='*', help='JSON Lines from `extract` (default: stdin)')
+    p.set_defaults(func=cmd_parse)
+
+    p = subparsers.add_parser('classify', help='variants -> Apparatus records')
+    p.add_argument('files', nargs='*', help='JSON Lines from `parse` (default: stdin)')
+    p.add_argument('--song-name', help='override the song name of every variant')
+    p.add_argument('--source', default='ש', help='base witness the variants are relative to')
+    p.add_argument('-o', '--output', help='write a binary .shn corpus instead of JSON Lines')
+    p.set_defaults(func=cmd_classify)
+
+    p = subparsers.add_parser('run', help='docx -> Apparatus records, with all stages pipelined in one process')
+    p.add_argument('files', nargs='+', help='poem .docx files')
+    p.add_argument('--source', default='ש', help='base witness the variants are relative to')
+    p.add_argument('--queue-size', type=int, default=64, help='capacity of each inter-stage queue')
+    p.add_argument('-o', '--output', help='write a binary .shn corpus instead of JSON Lines')
+    p.set_defaults(func=cmd_run)
+
+    p = subparsers.add_parser('stats', help='count Apparatus records by type (or another field)')
+    p.add_argument('files', nargs='*', help='.shn corpora or JSON Lines from `classify` (default: stdin)')
+    p.add_argument('--by', default='type', choices=['type', 'target', 'song_name', 'line'])
+    p.set_defaults(func=cmd_stats)
+
+    p = subparsers.add_parser('graph', help='draw the manuscript graph of Apparatus records')
+    p.add_argument('files', nargs='*', help='.shn corpora or JSON Lines from `classify` (default: stdin)')
+    p.add_argument('-o', '--output', help='save the figure to this path instead of showing it')
+    p.add_argument('--layout', default='sfdp', choices=['sfdp', 'spring', 'kamada_kawai', 'circular'])
+    p.add_argument('--min-edge-weight', type=int, default=1)
+    p.add_argument('--lod', action='store_true', help='level-of-detail rendering for dense graphs')
+    p.add_argument('--max-primitives', type=int, default=400)
+    p.add_argument('--seed', type=int, default=42)
+    p.set_defaults(func=cmd_graph)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # downstream closed early (e.g. `| head`); silence the flush at interpreter exit
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == '__main__':
+    main()
@@ -10,9 +10,9 @@ from typing import Iterable, Mapping, Sequence, Tuple, Dict, Any, Optional, List
 
 import matplotlib
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 from matplotlib.lines import Line2D
 import networkx as nx
+import numpy as np
 import random
 import json
 import os
@@ -101,13 +101,281 @@ def _categorical_color_map(categories: Sequence[str]) -> Dict[str, Any]:
     """
     # Use a qualitative palette with enough distinct colors. If overflow, cycle.
     unique = list(dict.fromkeys(categories))  # preserve order
-    base_cmap = cm.get_cmap("tab20")
+    base_cmap = matplotlib.colormaps["tab20"]
     colors = {}
     for i, cat in enumerate(unique):
         colors[cat] = base_cmap(i % base_cmap.N)
     return colors
 
 
+def _compute_layout(
+        H: nx.Graph,
+        layout: str,
+        k: Optional[float],
+        iterations: int,
+        seed: int,
+) -> Dict[Any, Tuple[float, float]]:
+    """
+    Node positions for the layout names accepted by `draw_manuscript_graph`.
+    """
+    if layout == "spring" or layout == "sfdp":
+        # tuned spring layout for larger graphs
+        # k controls spacing; lower k = more compact
+        k_val = k if k is not None else 1 / math.sqrt(max(1, H.number_of_nodes()))
+        return nx.spring_layout(H, k=k_val, iterations=iterations, seed=seed)
+    elif layout == "kamada_kawai":
+        return nx.kamada_kawai_layout(H)
+    elif layout == "circular":
+        return nx.circular_layout(H)
+    else:
+        return nx.spring_layout(H, seed=seed)
+
+
+# --- Level-of-detail (LOD) rendering ---
+# Dense graphs are collapsed into community super-nodes instead of being subsampled: a Louvain
+# hierarchy is computed once per figure, every level keeps the summed weight of all edges it
+# aggregates, and each render draws the finest level whose visible edges fit a budget. If even the
+# coarsest level does not fit, its lightest edges are folded into one aggregate per type.
+
+class LODLevel:
+    """
+    One level of the community hierarchy: node -> group membership and aggregated edge weights.
+    Edges inside a group become self-loops on its super-node, so total weight is conserved.
+    """
+
+    def __init__(self, groups: List[List[Any]], counts: Mapping[Tuple[Any, Any, str], int]):
+        self.groups = groups
+        self.membership = {n: gi for gi, members in enumerate(groups) for n in members}
+        edges: Dict[Tuple[int, int, str], int] = defaultdict(int)
+        for (u, v, t), w in counts.items():
+            edges[(self.membership[u], self.membership[v], t)] += w
+        self.edges = dict(edges)
+
+    def label(self, group: int) -> str:
+        members = self.groups[group]
+        if len(members) == 1:
+            return str(members[0])
+        return f"{members[0]} (+{len(members) - 1})"
+
+
+class _LevelFrame:
+    """
+    Geometry of one level under a fixed layout: super-node centroids, edge endpoint coordinates as
+    arrays (so that the per-frame view test is vectorized) and super-nodes ranked by strength.
+    """
+
+    def __init__(self, level: LODLevel, pos: Mapping[Any, Any]):
+        xy = np.array([np.mean([pos[n] for n in members], axis=0) for members in level.groups]).reshape(-1, 2)
+        self.positions = {gi: (float(x), float(y)) for gi, (x, y) in enumerate(xy)}
+        self.sizes = np.sqrt([len(members) for members in level.groups])
+        self.edges = list(level.edges)
+        self.weights = np.array([level.edges[e] for e in self.edges], dtype=np.int64)
+        self.src_xy = xy[np.array([u for u, _, _ in self.edges], dtype=np.intp)]
+        self.dst_xy = xy[np.array([v for _, v, _ in self.edges], dtype=np.intp)]
+        strength = np.zeros(len(level.groups), dtype=np.int64)
+        np.add.at(strength, [u for u, _, _ in self.edges], self.weights)
+        np.add.at(strength, [v for _, v, _ in self.edges], self.weights)
+        self.by_strength = [int(g) for g in np.argsort(-strength, kind="stable")]
+
+    def visible(self, view: Optional[Tuple[float, float, float, float]]) -> np.ndarray:
+        """Indices of the edges with at least one end inside `view` (x0, x1, y0, y1)."""
+        if view is None:
+            return np.arange(len(self.edges))
+        lo = np.array([min(view[0], view[1]), min(view[2], view[3])])
+        hi = np.array([max(view[0], view[1]), max(view[2], view[3])])
+        inside_src = ((self.src_xy >= lo) & (self.src_xy <= hi)).all(axis=1)
+        inside_dst = ((self.dst_xy >= lo) & (self.dst_xy <= hi)).all(axis=1)
+        return np.flatnonzero(inside_src | inside_dst)
+
+
+class LODHierarchy:
+    """
+    Hierarchical community collapse of an aggregated manuscript graph.
+
+    `levels[0]` has one group per manuscript; each further level merges the communities found by
+    successive Louvain passes. Positions of super-nodes are the centroids of their members.
+    """
+
+    def __init__(self, counts: Mapping[Tuple[Any, Any, str], int], seed: int = 42):
+        self.counts = dict(counts)
+        U = nx.Graph()
+        for (u, v, _t), w in self.counts.items():
+            U.add_node(u)
+            U.add_node(v)
+            if u != v:
+                prev = U.get_edge_data(u, v, default={"weight": 0})["weight"]
+                U.add_edge(u, v, weight=prev + w)
+        self.graph = U
+
+        self.levels: List[LODLevel] = [LODLevel([[n] for n in U.nodes], self.counts)]
+        if U.number_of_edges() > 0:
+            for partition in nx.community.louvain_partitions(U, weight="weight", seed=seed):
+                if len(partition) >= len(self.levels[-1].groups):
+                    continue
+                # order members by weighted degree so labels name the most connected manuscript
+                groups = [sorted(c, key=lambda n: -U.degree(n, weight="weight")) for c in partition]
+                self.levels.append(LODLevel(groups, self.counts))
+        self._layouts: Dict[Tuple[Any, ...], Dict[Any, Tuple[float, float]]] = {}
+        self._frames_pos: Optional[Mapping[Any, Any]] = None
+        self._frames: List[_LevelFrame] = []
+
+    def layout(self, layout: str, k: Optional[float], iterations: int, seed: int) -> Dict[Any, Tuple[float, float]]:
+        """
+        Positions of the individual manuscripts, computed once per layout setting.
+        """
+        key = (layout, k, iterations, seed)
+        if key not in self._layouts:
+            self._layouts[key] = _compute_layout(self.graph, layout, k, iterations, seed)
+        return self._layouts[key]
+
+    def frames(self, pos: Mapping[Any, Any]) -> List[_LevelFrame]:
+        """
+        Per-level geometry for the layout `pos`. It only depends on the layout, so it is built once
+        and reused by every frame drawn with the same `pos`.
+        """
+        if self._frames_pos is not pos:
+            self._frames = [_LevelFrame(level, pos) for level in self.levels]
+            self._frames_pos = pos
+        return self._frames
+
+    def level_positions(self, level: int, pos: Mapping[Any, Any]) -> Dict[int, Tuple[float, float]]:
+        return self.frames(pos)[level].positions
+
+    def select(
+            self,
+            pos: Mapping[Any, Any],
+            max_primitives: int,
+            view: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Tuple[int, Dict[int, Tuple[float, float]], Dict[Tuple[int, int, str], int], Dict[str, int]]:
+        """
+        Pick the finest level whose edges touching `view` (x0, x1, y0, y1) fit in `max_primitives`.
+        Returns (level index, super-node positions, visible edges, folded weight per type).
+
+        When no level fits, the coarsest level is used and its lightest edges are folded: they are
+        not returned as edges, but their weight is summed per type, and the single aggregate that
+        stands for them counts as one primitive. `len(visible) + bool(folded)` never exceeds
+        `max_primitives`.
+        """
+        for li, frame in enumerate(self.frames(pos)):
+            shown = frame.visible(view)
+            if len(shown) <= max_primitives:
+                return li, frame.positions, {frame.edges[i]: int(frame.weights[i]) for i in shown}, {}
+
+        ranked = shown[np.argsort(-frame.weights[shown], kind="stable")]
+        keep = max(max_primitives - 1, 0)
+        folded: Dict[str, int] = defaultdict(int)
+        for i in ranked[keep:]:
+            folded[frame.edges[i][2]] += int(frame.weights[i])
+        return li, frame.positions, {frame.edges[i]: int(frame.weights[i]) for i in ranked[:keep]}, dict(folded)
+
+
+def _draw_lod(
+        ax: plt.Axes,
+        hierarchy: LODHierarchy,
+        pos: Mapping[Any, Any],
+        color_map: Mapping[str, Any],
+        max_primitives: int,
+        view: Optional[Tuple[float, float, float, float]],
+        node_size: int,
+        edge_alpha: float,
+        edge_arrowstyle: str,
+        edge_arrowsize: int,
+) -> List[Any]:
+    """
+    Draw one LOD frame and return its artists so that the caller can remove them on zoom.
+    """
+    li, level_pos, visible, folded = hierarchy.select(pos, max_primitives, view)
+    level = hierarchy.levels[li]
+    frame = hierarchy.frames(pos)[li]
+
+    D = nx.MultiDiGraph()
+    D.add_nodes_from(level_pos)
+    for (u, v, t), w in visible.items():
+        D.add_edge(u, v, type=t, weight=w)
+
+    artists: List[Any] = []
+    sizes = list(node_size * frame.sizes)
+    artists.append(nx.draw_networkx_nodes(
+        D, level_pos, ax=ax, node_size=sizes, node_color="#cccccc", linewidths=0.0
+    ))
+    for t in sorted(set(t for _, _, t in visible)):
+        edges_of_type = [(u, v) for (u, v, tt) in visible if tt == t]
+        weights = [visible[(u, v, t)] for (u, v) in edges_of_type]
+        w_min, w_max = min(weights), max(weights)
+        if w_min == w_max:
+            linewidths = [1.0 for _ in weights]
+        else:
+            linewidths = [1.0 + 2.5 * (w - w_min) / (w_max - w_min) for w in weights]
+        drawn = nx.draw_networkx_edges(
+            D,
+            level_pos,
+            ax=ax,
+            edgelist=edges_of_type,
+            arrows=True,
+            arrowstyle=edge_arrowstyle,
+            arrowsize=edge_arrowsize,
+            width=linewidths,
+            edge_color=[color_map[t]] * len(edges_of_type),
+            alpha=edge_alpha,
+            node_size=sizes,
+            connectionstyle="arc3,rad=0.06",
+            min_source_margin=2,
+            min_target_margin=2,
+        )
+        artists.extend(drawn if isinstance(drawn, list) else [drawn])
+
+    # label the heaviest super-nodes only, as in the full-detail view
+    top_n = max(5, len(level_pos) // 10)
+    labeled = frame.by_strength[:top_n]
+    texts = nx.draw_networkx_labels(
+        D, level_pos, labels={g: level.label(g) for g in labeled}, font_size=9, ax=ax
+    )
+    artists.extend(texts.values())
+    if folded:
+        summary = ", ".join(f"{t}: {w}" for t, w in sorted(folded.items()))
+        artists.append(ax.text(
+            0.01, 0.01, f"lighter edges folded (weight {summary})",
+            transform=ax.transAxes, fontsize=8, color="#666666", va="bottom",
+        ))
+    return artists
+
+
+def enable_lod_zoom(
+        fig: plt.Figure,
+        ax: plt.Axes,
+        hierarchy: LODHierarchy,
+        pos: Mapping[Any, Any],
+        color_map: Mapping[str, Any],
+        max_primitives: int = 400,
+        **style: Any,
+) -> None:
+    """
+    Redraw `ax` at the level of detail matching its current view whenever the user pans or zooms.
+    Every frame draws at most `max_primitives` edges (lighter edges beyond that are folded into a
+    per-type aggregate), whatever the size of the underlying graph.
+
+    The frame is rebuilt on the canvas draw event rather than on `xlim_changed`/`ylim_changed`, so
+    a zoom that changes both limits redraws once, with the final view.
+    """
+    state = {"artists": [], "view": None}
+
+    def redraw(_event=None):
+        view = ax.get_xlim() + ax.get_ylim()
+        if view == state["view"]:
+            return
+        state["view"] = view
+        for artist in state["artists"]:
+            artist.remove()
+        state["artists"] = _draw_lod(ax, hierarchy, pos, color_map, max_primitives, view, **style)
+        ax.set_xlim(view[0], view[1])
+        ax.set_ylim(view[2], view[3])
+        fig.canvas.draw_idle()
+
+    ax.set_autoscale_on(False)
+    fig.canvas.mpl_connect("draw_event", redraw)
+    redraw()
+
+
 def draw_manuscript_graph(
         items: Iterable[Union[Mapping[str, Any], Any]],
         layout: str = "sfdp",
@@ -123,6 +391,8 @@ def draw_manuscript_graph(
         figsize: Tuple[int, int] = (12, 10),
         seed: int = 42,
         title: Optional[str] = "Manuscript Graph (source → target; edge color = apparatus type)",
+        lod: bool = False,
+        max_primitives: int = 400,
 ) -> Tuple[plt.Figure, plt.Axes]:
     """
     Render a large directed graph with edges colored by apparatus type.
@@ -137,6 +407,10 @@ def draw_manuscript_graph(
     - edge_arrowstyle, edge_arrowsize: styles for directed edges.
     - show_legend: include a legend mapping colors to edge types.
     - seed: for layout reproducibility.
+    - lod: level-of-detail mode. Manuscripts are collapsed into community super-nodes (weights
+           summed, never sampled) and at most `max_primitives` edges are drawn, the lightest ones
+           folded into a per-type aggregate; the detail is refined interactively as the axes are
+           zoomed. `max_edges_per_type` is ignored.
     """
     random.seed(seed)
     G = build_manuscript_graph(items)
@@ -145,6 +419,36 @@ def draw_manuscript_graph(
     # Filter by weight
     filtered = {k: w for k, w in counts.items() if w >= min_edge_weight}
 
+    if lod:
+        hierarchy = LODHierarchy(filtered, seed=seed)
+        pos = hierarchy.layout(layout, k, iterations, seed)
+        color_map = _categorical_color_map([t for (_, _, t) in filtered])
+
+        fig, ax = plt.subplots(figsize=figsize)
+        ax.set_title(title if title else "")
+        ax.axis("off")
+        if pos:
+            xs = [p[0] for p in pos.values()]
+            ys = [p[1] for p in pos.values()]
+            pad = 0.1 * max(max(xs) - min(xs), max(ys) - min(ys), 1e-9)
+            ax.set_xlim(min(xs) - pad, max(xs) + pad)
+            ax.set_ylim(min(ys) - pad, max(ys) + pad)
+        enable_lod_zoom(
+            fig, ax, hierarchy, pos, color_map, max_primitives=max_primitives,
+            node_size=node_size, edge_alpha=edge_alpha,
+            edge_arrowstyle=edge_arrowstyle, edge_arrowsize=edge_arrowsize,
+        )
+        if show_legend and color_map:
+            ax.legend(
+                handles=[Line2D([0], [0], color=color_map[t], lw=2, label=t) for t in sorted(color_map)],
+                title="Apparatus Type",
+                loc="lower right",
+                frameon=False,
+                ncols=1,
+            )
+        fig.tight_layout()
+        return fig, ax
+
     # Optionally cap per-type edges for readability/performance
     if max_edges_per_type is not None:
         by_type = defaultdict(list)
@@ -170,17 +474,7 @@ def draw_manuscript_graph(
         H.add_edge(u, v, type=t, weight=w)
 
     # Choose layout
-    if layout == "spring" or layout == "sfdp":
-        # tuned spring layout for larger graphs
-        # k controls spacing; lower k = more compact
-        k_val = k if k is not None else 1 / math.sqrt(max(1, H.number_of_nodes()))
-        pos = nx.spring_layout(H, k=k_val, iterations=iterations, seed=seed)
-    elif layout == "kamada_kawai":
-        pos = nx.kamada_kawai_layout(H)
-    elif layout == "circular":
-        pos = nx.circular_layout(H)
-    else:
-        pos = nx.spring_layout(H, seed=seed)
+    pos = _compute_layout(H, layout, k, iterations, seed)
 
     # Prepare color mapping
     edge_types = [data["type"] for _, _, data in H.edges(data=True)]
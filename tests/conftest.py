@@ -0,0 +1,7 @@
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, 'src')
+sys.path.insert(0, os.path.abspath(SRC))
+
+DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, 'data'))
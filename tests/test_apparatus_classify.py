@@ -0,0 +1,70 @@
+from apparatus_classes import *
+from apparatus_classify import classify_variant
+
+
+def variant(lemma, *parts, line=1, manuscript='ק'):
+    return {
+        'line': line,
+        'lemma': lemma,
+        'text': ' '.join(text for text, _ in parts),
+        'subsentences': [text for text, _ in parts],
+        'formats': [fmt for _, fmt in parts],
+        'manuscript': manuscript,
+    }
+
+
+def classify(lemma, *parts):
+    return classify_variant(variant(lemma, *parts), 'שיר')
+
+
+def test_common_fields():
+    correction = classify('עוז', ('עז', 'regular'))
+    assert (correction.song_name, correction.line, correction.lemma, correction.source, correction.target) == \
+        ('שיר', 1, 'עוז', 'ש', 'ק')
+
+
+def test_missing():
+    assert isinstance(classify('משיר', ('חסר', 'italic')), MissingApparatus)
+
+
+def test_deletion():
+    correction = classify('קטנים', ('עצומי', 'strike'), ('קטנים', 'regular'))
+    assert isinstance(correction, DeletionApparatus)
+    assert (correction.deleted, correction.corrected) == ('עצומי', 'קטנים')
+
+
+def test_deletion_of_the_same_word_is_dropped():
+    assert classify('קטנים', ('קטנים', 'strike'), ('קטנים', 'regular')) is None
+
+
+def test_comment_only():
+    correction = classify('וקל ... ושפי', ('ללא כותרת', 'italic'))
+    assert type(correction) is Apparatus
+    assert correction.comment == 'ללא כותרת'
+
+
+def test_full_spelling():
+    correction = classify('יתירה', ('יתרה', 'regular'))
+    assert isinstance(correction, FullSpellingApparatus)
+    assert correction.text == 'יתרה'
+
+
+def test_letter_swap():
+    correction = classify('אל', ('אז', 'regular'))
+    assert isinstance(correction, LetterSwapApparatus)
+    assert (correction.old_letter, correction.new_letter) == ('ל', 'ז')
+
+
+def test_order_swap():
+    assert isinstance(classify('אל עז', ('עז אל', 'regular')), OrderSwapApparatus)
+
+
+def test_word_swap():
+    assert isinstance(classify('בשמך', ('בשמחה', 'regular')), WordSwapApparatus)
+    assert isinstance(classify('ואל קנוא', ('ואל', 'regular')), WordSwapApparatus)
+
+
+def test_comment_after_correction():
+    correction = classify('מחסורם', ('מחסולם', 'regular'), ('והמעתיק סימן', 'italic'))
+    assert isinstance(correction, LetterSwapApparatus)
+    assert correction.comment == 'והמעתיק סימן'
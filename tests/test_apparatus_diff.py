@@ -0,0 +1,47 @@
+import pytest
+
+from apparatus_classes import *
+from apparatus_diff import diff_apparatus, diff_key
+
+COMMON = dict(song_name='אלוה עז', source='ש')
+
+
+def test_identical_editions():
+    records = [WordSwapApparatus(line=1, lemma='עוז', target='ק', text='כח', **COMMON)]
+    assert diff_apparatus(records, list(records)).is_empty()
+
+
+def test_added_and_removed():
+    kept = MissingApparatus(line=1, lemma='עוז', target='ק', **COMMON)
+    removed = MissingApparatus(line=2, lemma='אל', target='ק', **COMMON)
+    added = MissingApparatus(line=2, lemma='אל', target='ד2', **COMMON)
+    report = diff_apparatus([kept, removed], [added, kept])
+    assert [change.old for change in report.removed] == [removed]
+    assert [change.new for change in report.added] == [added]
+    assert not report.modified and not report.reclassified
+
+
+def test_reclassified():
+    old = FullSpellingApparatus(line=3, lemma='עז', target='ק', text='עוז', **COMMON)
+    new = WordSwapApparatus(line=3, lemma='עז', target='ק', text='עוז', **COMMON)
+    report = diff_apparatus([old], [new])
+    assert [(change.old, change.new) for change in report.reclassified] == [(old, new)]
+    assert not report.added and not report.removed and not report.modified
+
+
+def test_modified():
+    old = WordSwapApparatus(line=4, lemma='עוז', target='ק', text='כח', **COMMON)
+    new = WordSwapApparatus(line=4, lemma='עוז', target='ק', text='חיל', **COMMON)
+    report = diff_apparatus([old], [new])
+    assert [(change.kind, change.old, change.new) for change in report.modified] == [('modified', old, new)]
+    assert report.to_dict()['modified'][0]['new']['text'] == 'חיל'
+
+
+def test_presorted():
+    records = [MissingApparatus(line=line, lemma='עוז', target='ק', **COMMON) for line in (1, 2, 10)]
+    assert diff_apparatus(records, records[:2], presorted=True).removed[0].old == records[2]
+    # document order is not key order ('10' and '2' are compared as numbers, songs by name)
+    unsorted = records[::-1]
+    assert sorted(unsorted, key=diff_key) == records
+    with pytest.raises(ValueError, match='not sorted'):
+        diff_apparatus(records, unsorted, presorted=True)
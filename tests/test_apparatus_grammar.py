@@ -0,0 +1,46 @@
+import os
+
+from conftest import DATA
+from apparatus_grammar import is_apparatus_paragraph, parse_variants
+from docx_text import extract_paragraphs, join_paragraphs
+
+
+def test_is_apparatus_paragraph():
+    assert is_apparatus_paragraph('1 עוז] עז *ק*')
+    assert not is_apparatus_paragraph('מקורות: *פ* (19א-27א)')
+    assert not is_apparatus_paragraph('145\tופור משנה עשו לאל אשר קם / וסעף בעמלק ציץ ופ[א]רה')
+
+
+def test_line_variants():
+    variants = parse_variants('כותרת] כתרת *ק*   1 עוז] עז *ק*   6 אל] אז *ש* / יתירה] יתרה *ש* *ק*')
+    assert [(v['line'], v['lemma'], v['text'], v['manuscript']) for v in variants] == [
+        (0, 'כותרת', 'כתרת', 'ק'),
+        (1, 'עוז', 'עז', 'ק'),
+        (6, 'אל', 'אז', 'ש'),
+        (6, 'יתירה', 'יתרה', 'ש'),
+        (6, 'יתירה', 'יתרה', 'ק'),
+    ]
+
+
+def test_formats_are_kept_per_subsentence():
+    (variant,) = parse_variants('כותרת] כתרת *ק*   5 קטנים] ~עצומי~ קטנים *פ*')[1:]
+    assert variant['subsentences'] == ['עצומי', 'קטנים']
+    assert variant['formats'] == ['strike', 'regular']
+
+
+def test_slash_separates_variants_of_one_lemma():
+    # "... *ש* / _ללא כותרת_ *קמ*": the second variant has no lemma of its own
+    variants = parse_variants('וקל ... ושפי] ואמר *ש* / _ללא כותרת_ *קמ*   1 בעין] משן *קמ*')
+    assert [(v['line'], v['lemma'], v['manuscript'], v['formats']) for v in variants] == [
+        (0, 'וקל ... ושפי', 'ש', ['regular']),
+        (0, 'וקל ... ושפי', 'קמ', ['italic']),
+        (1, 'בעין', 'קמ', ['regular']),
+    ]
+
+
+def test_sample_documents_parse():
+    for name, expected in (('אלוה עז.docx', 230), ('תנומה בעין מכיר.docx', 168)):
+        paragraphs = join_paragraphs(extract_paragraphs(os.path.join(DATA, name)))
+        apparatus = [p for p in paragraphs if is_apparatus_paragraph(p)]
+        assert len(apparatus) == 1
+        assert len(parse_variants(apparatus[0])) >= expected
@@ -0,0 +1,104 @@
+import pytest
+
+from apparatus_classes import *
+from corpus_store import count_types, open_corpus, write_corpus
+
+COMMON = dict(song_name='אלוה עז', lemma='עוז', source='ש', target='ק')
+
+ONE_OF_EACH = [
+    Apparatus(line=0, comment='ללא כותרת', **COMMON),
+    MissingApparatus(line=1, **COMMON),
+    FullSpellingApparatus(line=2, text='עז', **COMMON),
+    LetterSwapApparatus(line=3, text='עיז', old_letter='ו', new_letter='י', comment='', **COMMON),
+    WordSwapApparatus(line=4, text='כח', **COMMON),
+    OrderSwapApparatus(line=5, text='עוז אל', **COMMON),
+    DeletionApparatus(line=149, deleted='עצומי', corrected='', **COMMON),
+]
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'corpus.shn'
+    write_corpus(path, ONE_OF_EACH)
+    return path
+
+
+def test_round_trip_every_type(corpus_path):
+    assert {type(item) for item in ONE_OF_EACH} == set(APPARATUS_TYPES.values())
+    with open_corpus(corpus_path) as corpus:
+        assert len(corpus) == len(ONE_OF_EACH)
+        assert list(corpus) == ONE_OF_EACH
+
+
+def test_none_and_empty_strings_are_distinct(corpus_path):
+    with open_corpus(corpus_path) as corpus:
+        assert corpus[0].comment == 'ללא כותרת'
+        assert corpus[1].comment is None
+        assert corpus[3].comment == ''
+        assert corpus[6].corrected == ''
+
+
+def test_indexing_and_slicing(corpus_path):
+    with open_corpus(corpus_path) as corpus:
+        assert corpus[-1] == ONE_OF_EACH[-1]
+        assert corpus[-len(ONE_OF_EACH)] == ONE_OF_EACH[0]
+        assert corpus[2:5] == ONE_OF_EACH[2:5]
+        assert corpus[::-2] == ONE_OF_EACH[::-2]
+        assert corpus[5:100] == ONE_OF_EACH[5:]
+        with pytest.raises(IndexError):
+            corpus[len(ONE_OF_EACH)]
+        with pytest.raises(IndexError):
+            corpus[-len(ONE_OF_EACH) - 1]
+
+
+def test_columns_and_lookup(corpus_path):
+    with open_corpus(corpus_path) as corpus:
+        assert list(corpus.column('line')) == [item.line for item in ONE_OF_EACH]
+        assert (corpus.column('target') == corpus.lookup('ק')).all()
+        assert corpus.lookup('פ') == -1
+
+
+def test_empty_corpus(tmp_path):
+    path = tmp_path / 'empty.shn'
+    assert write_corpus(path, []) == 0
+    with open_corpus(path) as corpus:
+        assert len(corpus) == 0
+        assert list(corpus) == []
+    assert count_types(path) == {}
+
+
+def test_count_types_matches_records(tmp_path):
+    items = ONE_OF_EACH * 3 + [MissingApparatus(line=7, **COMMON)] * 5
+    path = tmp_path / 'corpus.shn'
+    write_corpus(path, items)
+    with open_corpus(path) as corpus:
+        expected = {}
+        for item in corpus:
+            expected[item.type] = expected.get(item.type, 0) + 1
+    assert count_types(path) == expected
+
+
+def test_close(corpus_path):
+    corpus = open_corpus(corpus_path)
+    corpus.close()
+    corpus.close()
+    with pytest.raises(ValueError):
+        len(corpus)
+    # the mapping is gone, so the file can be replaced
+    write_corpus(corpus_path, ONE_OF_EACH[:1])
+    with open_corpus(corpus_path) as corpus:
+        assert list(corpus) == ONE_OF_EACH[:1]
+
+
+def test_version_is_checked(corpus_path):
+    data = corpus_path.read_bytes()
+    corpus_path.write_bytes(data.replace(b'"version": 1', b'"version": 9', 1))
+    with pytest.raises(ValueError, match='version'):
+        open_corpus(corpus_path)
+
+
+def test_bad_magic(tmp_path):
+    path = tmp_path / 'not.shn'
+    path.write_bytes(b'0' * 64)
+    with pytest.raises(ValueError, match='magic'):
+        open_corpus(path)
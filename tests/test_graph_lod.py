@@ -0,0 +1,62 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+from matplotlib.patches import FancyArrowPatch
+
+from viz.GPT_graph_viz import LODHierarchy
+
+
+def disjoint_pairs(n):
+    # n unconnected manuscript pairs: no community merge reduces the number of edges
+    return {(f'א{i}', f'ב{i}', 'missing' if i % 2 else 'word_swap'): i + 1 for i in range(n)}
+
+
+def test_select_respects_budget_and_keeps_weight():
+    counts = disjoint_pairs(200)
+    hierarchy = LODHierarchy(counts)
+    pos = hierarchy.layout('circular', None, 10, 42)
+    for budget in (1, 5, 50, 1000):
+        _, _, visible, folded = hierarchy.select(pos, budget)
+        assert len(visible) + bool(folded) <= budget
+        assert sum(visible.values()) + sum(folded.values()) == sum(counts.values())
+
+
+def test_folds_lightest_edges():
+    counts = disjoint_pairs(20)
+    hierarchy = LODHierarchy(counts)
+    _, _, visible, folded = hierarchy.select(hierarchy.layout('circular', None, 10, 42), 5)
+    assert sorted(visible.values()) == [17, 18, 19, 20]
+    assert folded == {'missing': 2 + 4 + 6 + 8 + 10 + 12 + 14 + 16, 'word_swap': 1 + 3 + 5 + 7 + 9 + 11 + 13 + 15}
+
+
+def test_lod_figure_redraws_once_per_view(monkeypatch):
+    import viz.GPT_graph_viz as graph_viz
+
+    frames = []
+    draw_lod = graph_viz._draw_lod
+
+    def recording(*args, **kwargs):
+        frames.append(draw_lod(*args, **kwargs))
+        return frames[-1]
+
+    monkeypatch.setattr(graph_viz, '_draw_lod', recording)
+    items = [{'song_name': 'שיר', 'line': i, 'lemma': 'עוז', 'source': f'א{i}', 'target': f'ב{i}',
+              'type': 'missing' if i % 2 else 'word_swap'} for i in range(60)]
+    fig, ax = graph_viz.draw_manuscript_graph(items, layout='circular', lod=True, max_primitives=10)
+    fig.canvas.draw()
+    assert len(frames) == 1
+    assert 0 < sum(isinstance(p, FancyArrowPatch) for p in ax.patches) <= 10
+
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    ax.set_xlim(x0 / 2, x1 / 2)
+    ax.set_ylim(y0 / 2, y1 / 2)
+    fig.canvas.draw()
+    fig.canvas.draw()
+    assert len(frames) == 2
+    assert not any(artist.axes for artist in frames[0])
+    assert all(artist in ax.patches or artist in ax.collections or artist in ax.texts for artist in frames[1])
+    assert sum(isinstance(p, FancyArrowPatch) for p in ax.patches) <= 10
+    plt.close(fig)
@@ -0,0 +1,148 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from conftest import DATA
+import apparatus_diff
+import pipeline
+from apparatus_diff import diff_key
+
+POEM = os.path.join(DATA, 'אלוה עז.docx')
+OTHER = os.path.join(DATA, 'תנומה בעין מכיר.docx')
+
+
+@pytest.fixture(scope='module')
+def poem_records():
+    return pipeline.process_document(POEM)
+
+
+def test_update_corpus_skips_unchanged_hash(tmp_path, monkeypatch, poem_records):
+    cache = tmp_path / 'cache'
+    report = pipeline.update_corpus([POEM], cache)
+    assert len(report['אלוה עז'].added) == len(poem_records)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('unchanged document was parsed again')
+
+    monkeypatch.setattr(pipeline, 'process_document', fail)
+    assert pipeline.update_corpus([POEM], cache) == {'אלוה עז': None}
+
+
+def test_update_corpus_replaces_superseded_version(tmp_path):
+    cache, docs = tmp_path / 'cache', tmp_path / 'docs'
+    docs.mkdir()
+    document = docs / 'אלוה עז.docx'
+    shutil.copy(POEM, document)
+    pipeline.update_corpus([document], cache)
+    first_key = pipeline.cache_key(pipeline.document_hash(document), 'אלוה עז', 'ש')
+
+    # a new edition of the poem under the same name
+    shutil.copy(OTHER, document)
+    report = pipeline.update_corpus([document], cache)
+    assert report['אלוה עז'].removed and report['אלוה עז'].added
+    new_key = pipeline.cache_key(pipeline.document_hash(document), 'אלוה עז', 'ש')
+    assert sorted(os.listdir(cache)) == sorted([new_key + '.shn', 'manifest.json'])
+    assert not (cache / f'{first_key}.shn').exists()
+
+
+def test_renamed_document_is_not_served_from_cache(tmp_path):
+    cache, docs = tmp_path / 'cache', tmp_path / 'docs'
+    docs.mkdir()
+    shutil.copy(POEM, docs / 'א.docx')
+    shutil.copy(POEM, docs / 'ב.docx')
+    pipeline.update_corpus([docs / 'א.docx'], cache)
+    report = pipeline.update_corpus([docs / 'ב.docx'], cache)
+    assert {change.new.song_name for change in report['ב'].added} == {'ב'}
+    with pipeline.load_document(docs / 'א.docx', cache) as records:
+        assert {record.song_name for record in records} == {'א'}
+
+
+def test_source_is_part_of_cache_key(tmp_path, poem_records):
+    with pipeline.load_document(POEM, tmp_path) as records:
+        assert list(records) == sorted(poem_records, key=diff_key)
+    with pipeline.load_document(POEM, tmp_path, song_name='אחר', source='ק') as records:
+        assert {(record.song_name, record.source) for record in records} == {('אחר', 'ק')}
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_cached_corpora_are_diffed_in_one_pass(tmp_path, monkeypatch):
+    cache, docs = tmp_path / 'cache', tmp_path / 'docs'
+    docs.mkdir()
+    document = docs / 'אלוה עז.docx'
+    shutil.copy(POEM, document)
+    pipeline.update_corpus([document], cache)
+    shutil.copy(OTHER, document)
+
+    def unsorted(*args, **kwargs):
+        raise AssertionError('cached corpora were re-sorted')
+
+    monkeypatch.setattr(apparatus_diff, 'sorted', unsorted, raising=False)
+    report = pipeline.update_corpus([document], cache)
+    assert report['אלוה עז'].removed
+
+
+def test_interrupted_write_leaves_no_cache_file(tmp_path, monkeypatch):
+    def broken(path, items):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(pipeline, 'write_corpus', broken)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.load_document(POEM, tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_matches_process_document(poem_records):
+    other = pipeline.process_document(OTHER)
+    assert list(pipeline.stream_documents([POEM, OTHER], maxsize=2)) == poem_records + other
+
+
+def test_stream_stage_error_is_raised(monkeypatch):
+    calls = []
+
+    def failing(variant, song_name, source):
+        calls.append(variant)
+        if len(calls) == 5:
+            raise RuntimeError('classifier failed')
+        return original(variant, song_name, source)
+
+    original = pipeline.classify_variant
+    monkeypatch.setattr(pipeline, 'classify_variant', failing)
+    threads = threading.active_count()
+    records = []
+    with pytest.raises(RuntimeError, match='classifier failed'):
+        for record in pipeline.stream_documents([POEM]):
+            records.append(record)
+    assert len(records) < 5
+    assert threading.active_count() == threads
+
+
+def test_stream_closed_early():
+    threads = threading.active_count()
+    stream = pipeline.stream_documents([POEM, OTHER], maxsize=1)
+    first = next(stream)
+    assert first.song_name == 'אלוה עז'
+    # the stages are blocked on full queues; closing must wind them down
+    stream.close()
+    assert threading.active_count() == threads
+
+
+def test_stream_close_cancels_stages_immediately(monkeypatch):
+    calls = []
+    closed = threading.Event()
+    original = pipeline.classify_variant
+
+    def counting(variant, song_name, source):
+        calls.append(closed.is_set())
+        return original(variant, song_name, source)
+
+    monkeypatch.setattr(pipeline, 'classify_variant', counting)
+    stream = pipeline.stream_documents([POEM, OTHER], maxsize=32)
+    next(stream)
+    closed.set()
+    stream.close()
+    # only the classification in progress when the stream was closed may still run
+    assert calls.count(True) <= 1
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from conftest import DATA
+from apparatus_classes import *
+from reconstruction import PieceTable, anchor_lemma, base_text_lines, load_base_text, reconstruct_witnesses
+
+SONG = 'שיר'
+BASE = {SONG: {0: 'כותרת', 1: 'אלוה עוז ואל קנוא ונורא', 2: 'ויום חלק שלל ויום גיל'}}
+
+
+def missing(line, lemma, target='ק'):
+    return MissingApparatus(song_name=SONG, line=line, lemma=lemma, source='ש', target=target)
+
+
+def swap(line, lemma, text, target='ק'):
+    return WordSwapApparatus(song_name=SONG, line=line, lemma=lemma, source='ש', target=target, text=text)
+
+
+def test_piece_table():
+    table = PieceTable('אבג דהו זחט')
+    assert table.replace(4, 7, 'יכל')
+    assert table.replace(0, 3, '')
+    assert table.text() == ' יכל זחט'
+    assert not table.replace(5, 9, 'מנ')  # overlaps the first edit
+    assert table.text() == ' יכל זחט'
+    assert table.base == 'אבג דהו זחט'
+
+
+def test_anchor_whole_words_and_brackets():
+    assert anchor_lemma('ואל ישראל אל', 'אל') == [(10, 12)]
+    assert anchor_lemma('נשמת גופ[ו] יחד', 'גופו') == [(5, 11)]
+    assert anchor_lemma('אלוה עוז ואל', 'אלוה ... ואל') == [(0, 12)]
+    assert anchor_lemma('אלוה עוז', 'כח') == []
+    assert len(anchor_lemma('ויום חלק ויום', 'ויום')) == 2
+
+
+def test_reconstruct():
+    result = reconstruct_witnesses(BASE, [swap(1, 'עוז', 'עז'), missing(1, 'קנוא'), swap(1, 'ונורא', 'ונשגב', 'ד2')])
+    assert result.witnesses(SONG) == ['ד2', 'ק']
+    assert result.witness_lines(SONG, 'ק') == {0: 'כותרת', 1: 'אלוה עז ואל ונורא', 2: 'ויום חלק שלל ויום גיל'}
+    assert result.witness_lines(SONG, 'ד2')[1] == 'אלוה עוז ואל קנוא ונשגב'
+    assert result.witness_text(SONG, 'ש') == '\n'.join(BASE[SONG][line] for line in range(3))
+    assert not result.issues
+
+
+def test_missing_words_take_one_space():
+    result = reconstruct_witnesses(BASE, [missing(1, 'ונורא'), missing(1, 'קנוא'), missing(1, 'אלוה')])
+    assert result.witness_lines(SONG, 'ק')[1] == 'עוז ואל'
+    assert not result.issues
+
+
+def test_issues():
+    first, second = swap(1, 'עוז', 'עז'), swap(1, 'אלוה ... ואל', 'אל עז')
+    records = [first, second, swap(2, 'ויום', 'וביום'), swap(1, 'כח', 'עז'), swap(5, 'עוז', 'עז')]
+    result = reconstruct_witnesses(BASE, records)
+    assert {issue.record: issue.kind for issue in result.issues} == {
+        second: 'conflict', records[2]: 'ambiguous', records[3]: 'unanchored', records[4]: 'unanchored'}
+    assert next(issue for issue in result.issues if issue.kind == 'conflict').other == first
+    assert result.witness_lines(SONG, 'ק')[2] == BASE[SONG][2]
+
+
+def test_song_without_base_text():
+    record = WordSwapApparatus(song_name='אחר', line=1, lemma='עוז', source='ש', target='ק', text='עז')
+    result = reconstruct_witnesses(BASE, [record])
+    assert [issue.kind for issue in result.issues] == ['unanchored']
+    assert result.witness_lines('אחר', 'ק') == {}
+    assert result.witness_text('אחר', 'ק') == ''
+
+
+def test_base_text_lines():
+    paragraphs = ['כותרת', 'שורה *ש*', 'שנייה\t\tק', '3\tשלישית', '*תם*', '', 'הערות']
+    assert base_text_lines(paragraphs) == {0: 'כותרת', 1: 'שורה', 2: 'שנייה', 3: 'שלישית'}
+
+
+def test_base_text_verse_number_mismatch():
+    # a stanza break before line 2 shifts the explicit verse number
+    with pytest.raises(ValueError, match='verse number 3'):
+        base_text_lines(['כותרת', 'שורה', 'בית ב', 'שנייה', '3\tשלישית'])
+
+
+def test_sample_base_texts():
+    assert len(load_base_text(os.path.join(DATA, 'אלוה עז.docx'))) == 150
+    tenuma = load_base_text(os.path.join(DATA, 'תנומה בעין מכיר.docx'))
+    assert max(tenuma) == 70 and 'תם' not in tenuma.values()